@@ -24,6 +24,7 @@
 import os.path
 import os
 import logging
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import geopandas as gpd
 from qgis.core import QgsProject, QgsVectorLayer, QgsLayerTreeLayer
@@ -36,7 +37,7 @@ from qgis.PyQt.QtWidgets import QAction, QListWidgetItem
 from .resources import *
 # Import the code for the dialog
 from .mbr_shapefile_generator_dialog import MBRShapefileGeneratorDialog
-from .utility import zoneid_suffixid_combine, build_multipolygon, REQUIRED_HEADERS, HELP_DOCUMENTATION
+from .utility import zoneid_suffixid_combine_vec, submit_multipolygons, REQUIRED_HEADERS, HELP_DOCUMENTATION
 import webbrowser
 
 
@@ -80,63 +81,71 @@ class ProcessWorker(QObject):
         """Processes the dataframe and generates shapefiles or KML files for the selected customers and zones.
         The function first creates a directory for each customerid in the output directory.
         Then it iterates through the selected customers and zones, creating a shapefile or KML file for each zone.
-        The shapefile or KML file is created using the geopandas library and the build_multipolygon function.
+        The geometries of all selected zones are submitted to a thread pool with the submit_multipolygons function
+        and each result is collected when its zone is written.
+        The shapefile or KML file is created using the geopandas library.
         The function emits log messages for each step of the process, including errors and warnings.
         The function also emits a progress signal for each zone processed.
         Finally, it emits a finished signal when the process is complete.
         """
         final_datasets = []
-        for customerid in self.selected_customers:
-            # Add logic for geodatabase creation later
-            output_dir = os.path.join(self.output_dir, customerid.lower())
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            customer_zones = self.df['zoneid_suffixid'][self.df['customerid'] == customerid].unique()
-            for i, zone in enumerate(customer_zones):
-                if zone not in self.selected_zones:
-                    continue
-                zone_df = self.df[self.df['zoneid_suffixid'] == zone]
-                try:
-                    polygon = build_multipolygon(zone_df)
+        selected_df = self.df[self.df['customerid'].isin(self.selected_customers)]
+        zones = set(selected_df['zoneid_suffixid']) & set(self.selected_zones)
+        with ThreadPoolExecutor() as executor:
+            futures = submit_multipolygons(executor, self.df[self.df['zoneid_suffixid'].isin(zones)])
+            for customerid in self.selected_customers:
+                # Add logic for geodatabase creation later
+                output_dir = os.path.join(self.output_dir, customerid.lower())
+                if not os.path.exists(output_dir):
+                    os.makedirs(output_dir)
+                customer_zones = self.df['zoneid_suffixid'][self.df['customerid'] == customerid].unique()
+                for i, zone in enumerate(customer_zones):
+                    if zone not in self.selected_zones:
+                        continue
+                    try:
+                        polygon = futures[zone].result()
+                    except Exception as e:
+                        self.log_message.emit(logging.ERROR, f"Error building polygon for zone {zone}: {str(e)}")
+                        continue
+                    if polygon is None:
+                        self.log_message.emit(logging.ERROR, f"No valid polygon geometry found for zone {zone}")
+                        continue
                     self.log_message.emit(logging.DEBUG, f"Polygon successfully built for zone {zone}")
-                except Exception as e:
-                    self.log_message.emit(logging.ERROR, f"Error building polygon for zone {zone}: {str(e)}")
-                    continue
-                num_polygons = len(polygon.geoms) if hasattr(polygon, 'geoms') else 1
-                num_holes = sum(len(poly.interiors) for poly in polygon.geoms) if hasattr(polygon, 'geoms') else len(polygon.interiors)
-                self.log_message.emit(logging.INFO, f"Zone {zone} generated: {num_polygons} polygon parts, {num_holes} holes")
-                gdf = gpd.GeoDataFrame(
-                    {'geometry': [polygon]},
-                    crs='EPSG:4326'
-                )
+                    num_polygons = len(polygon.geoms) if hasattr(polygon, 'geoms') else 1
+                    num_holes = sum(len(poly.interiors) for poly in polygon.geoms) if hasattr(polygon, 'geoms') else len(polygon.interiors)
+                    self.log_message.emit(logging.INFO, f"Zone {zone} generated: {num_polygons} polygon parts, {num_holes} holes")
+                    gdf = gpd.GeoDataFrame(
+                        {'geometry': [polygon]},
+                        crs='EPSG:4326'
+                    )
                 
-                path = None
-                output_ext = 'kml' if self.output_type == 'KML' else 'shp'
-                path = os.path.join(output_dir, f"{zone}.{output_ext}")
-                if os.path.exists(path):
+                    path = None
+                    output_ext = 'kml' if self.output_type == 'KML' else 'shp'
+                    path = os.path.join(output_dir, f"{zone}.{output_ext}")
+                    if os.path.exists(path):
+                        try:
+                            os.remove(path)
+                            self.log_message.emit(logging.INFO, f"Existing file at {path} removed.")
+                        except Exception as e:
+                            self.log_message.emit(logging.ERROR, f"Failed to remove existing file at {path}: {str(e)}")
+                            continue
+
                     try:
-                        os.remove(path)
-                        self.log_message.emit(logging.INFO, f"Existing file at {path} removed.")
+                        if self.output_type == 'KML':
+                            gdf.to_file(path, driver='KML')
+                            self.log_message.emit(logging.INFO, f"KML file created for zone {zone}")
+                        elif self.output_type == 'Shapefile':
+                            gdf.to_file(path, driver='ESRI Shapefile')
+                            self.log_message.emit(logging.INFO, f"Shapefile created for zone {zone}")
                     except Exception as e:
-                        self.log_message.emit(logging.ERROR, f"Failed to remove existing file at {path}: {str(e)}")
+                        self.log_message.emit(logging.ERROR, f"Failed to create file for zone {zone} at {path}: {str(e)}")
                         continue
-
-                try:
-                    if self.output_type == 'KML':
-                        gdf.to_file(path, driver='KML')
-                        self.log_message.emit(logging.INFO, f"KML file created for zone {zone}")
-                    elif self.output_type == 'Shapefile':
-                        gdf.to_file(path, driver='ESRI Shapefile')
-                        self.log_message.emit(logging.INFO, f"Shapefile created for zone {zone}")
-                except Exception as e:
-                    self.log_message.emit(logging.ERROR, f"Failed to create file for zone {zone} at {path}: {str(e)}")
-                    continue
-                final_datasets.append({
-                    'customerid': customerid,
-                    'zoneid_suffixid': zone,
-                    'path': path
-                })
-                self.progress.emit(i + 1)
+                    final_datasets.append({
+                        'customerid': customerid,
+                        'zoneid_suffixid': zone,
+                        'path': path
+                    })
+                    self.progress.emit(i + 1)
         self.display_layers.emit(final_datasets)
         self.finished.emit()
 
@@ -372,7 +381,7 @@ class MBRShapefileGenerator:
     def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame | None:
         """Cleans the dataframe by renaming the columns to lowercase and checking for required headers.
         It also creates a new column 'zoneid_suffixid' by combining the 'zoneid' and 'suffixid' columns 
-        using the zoneid_suffixid_combine function.
+        using the zoneid_suffixid_combine_vec function.
 
         Args:
             df (pd.DataFrame): geometry dataframe
@@ -386,7 +395,16 @@ class MBRShapefileGenerator:
                               [o for o in REQUIRED_HEADERS if o not in df.columns])
             self.dlg.process_button.setToolTip(f"Input file missing the following required headers: {[o for o in REQUIRED_HEADERS if o not in df.columns]}")
             return None
-        df['zoneid_suffixid'] = df.apply(zoneid_suffixid_combine, axis=1)
+        # float64 coordinates let build_multipolygon use the column buffers without converting them
+        coords = df[['x', 'y']].apply(pd.to_numeric, errors='coerce').astype('float64')
+        bad_rows = (coords.isna() & df[['x', 'y']].notna()).any(axis=1)
+        if not bad_rows.any():
+            df[['x', 'y']] = coords
+        df['zoneid_suffixid'] = zoneid_suffixid_combine_vec(df)
+        if bad_rows.any():
+            # Columns are left as read, the affected zones fail when their polygons are built
+            self.logger.warning("Non-numeric x/y values found in zoneid_suffixids: %s",
+                                sorted(set(df.loc[bad_rows, 'zoneid_suffixid'])))
         unique_customers = df['customerid'].nunique()
         unique_zones = df['zoneid_suffixid'].nunique()
         self.logger.info("Unique customerids: %d", unique_customers)
@@ -0,0 +1,202 @@
+# coding=utf-8
+"""Utility test.
+
+.. note:: This program is free software; you can redistribute it and/or modify
+     it under the terms of the GNU General Public License as published by
+     the Free Software Foundation; either version 2 of the License, or
+     (at your option) any later version.
+
+"""
+
+__author__ = 'dcahoon@korterra.com'
+__date__ = '2025-04-07'
+__copyright__ = 'Copyright 2025, Dan Cahoon'
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+import shapely
+
+import utility
+from utility import (zoneid_suffixid_combine, zoneid_suffixid_combine_vec, split_geometry, build_multipolygon,
+                     build_all_multipolygons)
+
+
+def zone_dataframe():
+    """Returns zoneid/suffixid rows covering None, NaN, whitespace, numeric and sentinel inputs."""
+    return pd.DataFrame({
+        'zoneid': ['Z1', 'Z2', 'Z3', 'Z4', 'Z5', 'Z6', 'Z7', 'Z8', 9, np.nan, None],
+        'suffixid': [None, np.nan, '', '  ', 'none', 'NULL', ' nan ', ' a', 7, 'b', 'c'],
+    }, dtype=object)
+
+
+class ZoneidSuffixidCombineTest(unittest.TestCase):
+    """Test the column-wise combine matches the row-wise combine."""
+
+    def assert_matches_row_function(self, df):
+        expected = df.apply(zoneid_suffixid_combine, axis=1)
+        result = zoneid_suffixid_combine_vec(df)
+        self.assertEqual(result.tolist(), expected.tolist())
+        self.assertEqual(result.dtype, object)
+        self.assertTrue(result.index.equals(df.index))
+
+    def test_pandas_path(self):
+        """Test the pandas string path without pyarrow."""
+        with mock.patch.object(utility, 'pa', None):
+            self.assert_matches_row_function(zone_dataframe())
+
+    @unittest.skipIf(utility.pa is None, 'pyarrow is not installed')
+    def test_pyarrow_path(self):
+        """Test the pyarrow compute path."""
+        self.assert_matches_row_function(zone_dataframe())
+
+    def test_numeric_columns(self):
+        """Test float zoneid and suffixid columns with missing values."""
+        df = pd.DataFrame({'zoneid': [1.0, np.nan, 3.0], 'suffixid': [1.0, 2.5, np.nan]})
+        with mock.patch.object(utility, 'pa', None):
+            self.assert_matches_row_function(df)
+        if utility.pa is not None:
+            self.assert_matches_row_function(df)
+
+
+def area_dataframe(*areas):
+    """Returns geometry rows for a single zoneid_suffixid. Each area is a list of rings,
+    the rings of an area are separated by (0, 0) rows like the areapoint table."""
+    rows = []
+    for areanumber, rings in enumerate(areas, start=1):
+        seqno = 0
+        for i, ring in enumerate(rings):
+            for x, y in ([(0.0, 0.0)] if i else []) + list(ring):
+                rows.append((areanumber, seqno, x, y))
+                seqno += 1
+    return pd.DataFrame(rows, columns=['areanumber', 'seqno', 'x', 'y'])
+
+
+SQUARE = [(5.0, 5.0), (6.0, 5.0), (6.0, 6.0), (5.0, 6.0), (5.0, 5.0)]
+COLLAPSED = [(1.0, 1.0), (2.0, 1.0), (3.0, 1.0)]
+
+
+class BuildMultipolygonTest(unittest.TestCase):
+    """Test building the geometry of a single zoneid_suffixid."""
+
+    def test_collapsed_single_area(self):
+        """Test an area that make_valid collapses to a line produces no geometry."""
+        self.assertIsNone(build_multipolygon(area_dataframe([COLLAPSED])))
+
+    def test_collapsed_part_dropped(self):
+        """Test a collapsed area is dropped and the remaining area is kept."""
+        polygon = build_multipolygon(area_dataframe([SQUARE], [COLLAPSED]))
+        self.assertEqual(polygon.geom_type, 'Polygon')
+        self.assertAlmostEqual(polygon.area, 1.0)
+
+    def test_mixed_areanumber_types(self):
+        """Test an object areanumber column mixing str and int values, as read_excel can produce."""
+        df = area_dataframe([SQUARE], [[(x + 3, y) for x, y in SQUARE]])
+        df['areanumber'] = df['areanumber'].astype(object)
+        df.loc[df['areanumber'] == 2, 'areanumber'] = 'B'
+        polygon = build_multipolygon(df)
+        self.assertEqual(polygon.geom_type, 'MultiPolygon')
+        self.assertEqual(len(polygon.geoms), 2)
+        self.assertAlmostEqual(polygon.area, 2.0)
+
+    def assert_winding(self, polygon):
+        """Asserts the exterior is counterclockwise and every hole is clockwise."""
+        self.assertTrue(polygon.exterior.is_ccw)
+        for interior in polygon.interiors:
+            self.assertFalse(interior.is_ccw)
+
+    def test_winding(self):
+        """Test exterior and holes are wound correctly for either input direction."""
+        outer = [(0.0, 10.0), (10.0, 10.0), (10.0, 20.0), (0.0, 20.0), (0.0, 10.0)]
+        inner = [(2.0, 12.0), (4.0, 12.0), (4.0, 14.0), (2.0, 14.0), (2.0, 12.0)]
+        for exterior, hole in [(outer, inner), (outer[::-1], inner[::-1]), (outer, inner[::-1])]:
+            polygon = build_multipolygon(area_dataframe([exterior, hole]))
+            self.assertEqual(polygon.geom_type, 'Polygon')
+            self.assertEqual(len(polygon.interiors), 1)
+            self.assertAlmostEqual(polygon.area, 96.0)
+            self.assert_winding(polygon)
+
+    def test_unclosed_ring(self):
+        """Test rings without a closing vertex are closed."""
+        polygon = build_multipolygon(area_dataframe([SQUARE[:-1]], [[(x + 3, y) for x, y in SQUARE[:-1]]]))
+        self.assertEqual(polygon.geom_type, 'MultiPolygon')
+        for part in polygon.geoms:
+            self.assertTrue(part.exterior.is_closed)
+            self.assertAlmostEqual(part.area, 1.0)
+
+    def test_duplicate_vertices(self):
+        """Test consecutive duplicate vertices are removed."""
+        duplicated = [SQUARE[0], SQUARE[0], SQUARE[1], SQUARE[2], SQUARE[2], SQUARE[2], SQUARE[3], SQUARE[4]]
+        polygon = build_multipolygon(area_dataframe([duplicated]))
+        self.assertTrue(polygon.equals_exact(shapely.Polygon(SQUARE), 0))
+
+    def test_self_intersection_repaired(self):
+        """Test a self-intersecting area is repaired to a MultiPolygon."""
+        bowtie = [(1.0, 1.0), (3.0, 3.0), (1.0, 3.0), (3.0, 1.0), (1.0, 1.0)]
+        polygon = build_multipolygon(area_dataframe([bowtie]))
+        self.assertEqual(polygon.geom_type, 'MultiPolygon')
+        self.assertTrue(polygon.is_valid)
+        self.assertAlmostEqual(polygon.area, 2.0)
+
+    def test_validate_false(self):
+        """Test validate=False returns the polygon without repairing it."""
+        bowtie = [(1.0, 1.0), (3.0, 3.0), (1.0, 3.0), (3.0, 1.0), (1.0, 1.0)]
+        polygon = build_multipolygon(area_dataframe([bowtie]), validate=False)
+        self.assertEqual(polygon.geom_type, 'Polygon')
+        self.assertFalse(polygon.is_valid)
+        self.assertTrue(polygon.equals_exact(shapely.Polygon(bowtie), 0))
+
+    def test_fast_path_matches_full_path(self):
+        """Test the single-area fast path builds the same polygon as the full path."""
+        ring = [SQUARE[0], SQUARE[0]] + SQUARE[1:][::-1]
+        df = area_dataframe([ring]).sample(frac=1, random_state=0)
+        # A trailing separator row skips the fast path without changing the geometry
+        separator = pd.DataFrame([(1, len(df), 0.0, 0.0)], columns=df.columns)
+        fast = build_multipolygon(df)
+        full = build_multipolygon(pd.concat([df, separator]))
+        self.assertTrue(fast.equals_exact(full, 0))
+        self.assert_winding(fast)
+
+    def test_split_geometry_without_numba(self):
+        """Test split_geometry gives the same parts with the numpy separator scan."""
+        coords = area_dataframe([SQUARE, SQUARE[1:], [(5.5, 5.5)]])[['x', 'y']].to_numpy()
+        coords = np.vstack([[0.0, 0.0], coords, [0.0, 0.0], [0.0, 0.0]])
+        expected = {'exterior': np.array(SQUARE), 'holes': [np.array(SQUARE[1:]), np.array([(5.5, 5.5)])]}
+        results = [split_geometry(coords)]
+        with mock.patch.object(utility, '_find_splits', None):
+            results.append(split_geometry(coords))
+        for result in results:
+            np.testing.assert_array_equal(result['exterior'], expected['exterior'])
+            self.assertEqual(len(result['holes']), len(expected['holes']))
+            for hole, expected_hole in zip(result['holes'], expected['holes']):
+                np.testing.assert_array_equal(hole, expected_hole)
+
+
+class BuildAllMultipolygonsTest(unittest.TestCase):
+    """Test building every zoneid_suffixid of a dataframe."""
+
+    def test_polygons_and_errors(self):
+        """Test built zones are returned as polygons and failing zones as errors."""
+        df = pd.DataFrame({
+            'zoneid_suffixid': ['GOOD'] * 4 + ['MULTI'] * 8 + ['BAD'] * 2,
+            'areanumber': [1] * 4 + [1] * 4 + [2] * 4 + [1] * 2,
+            'seqno': [0, 1, 2, 3] * 3 + [0, 1],
+            'x': [0.5, 1.0, 1.0, 0.5, 2.0, 3.0, 3.0, 2.0, 5.0, 6.0, 6.0, 5.0, 1.0, 2.0],
+            'y': [0.5, 0.5, 1.0, 1.0, 2.0, 2.0, 3.0, 3.0, 5.0, 5.0, 6.0, 6.0, 1.0, 2.0],
+        })
+        polygons, errors = build_all_multipolygons(df, max_workers=2)
+        self.assertEqual(set(polygons), {'GOOD', 'MULTI'})
+        self.assertEqual(polygons['GOOD'].geom_type, 'Polygon')
+        self.assertAlmostEqual(polygons['GOOD'].area, 0.25)
+        self.assertEqual(polygons['MULTI'].geom_type, 'MultiPolygon')
+        self.assertEqual(len(polygons['MULTI'].geoms), 2)
+        self.assertEqual(set(errors), {'BAD'})
+        self.assertIsInstance(errors['BAD'], ValueError)
+
+
+if __name__ == "__main__":
+    suite = unittest.makeSuite(ZoneidSuffixidCombineTest)
+    runner = unittest.TextTestRunner(verbosity=2)
+    runner.run(suite)
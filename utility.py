@@ -1,16 +1,58 @@
 import logging
+import math
+import re
+from concurrent.futures import Executor, ThreadPoolExecutor
+import numpy as np
 import pandas as pd
-from shapely.geometry import Polygon, MultiPolygon, GeometryCollection
-from shapely.geometry.polygon import orient
-from shapely.validation import make_valid, explain_validity
+from shapely.geometry import Polygon, MultiPolygon
 import shapely
-from packaging import version
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, split_geometry falls back to numpy
+    njit = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional, zoneid_suffixid_combine_vec falls back to pandas string methods
+    pa = None
 
 
 logger = logging.getLogger(__name__)
 
 REQUIRED_HEADERS = ['customerid', 'zoneid', 'suffixid', 'areanumber', 'seqno', 'x', 'y']
 HELP_DOCUMENTATION = "https://korterra.atlassian.net/wiki/x/FIA1wg"
+# Normalized suffixid values that mean the zone has no suffix
+_SENTINEL = frozenset({'NONE', '', 'NULL', 'NAN'})
+# make_valid only accepts method='structure' from shapely 2.1.0 onwards
+_MAKE_VALID_STRUCTURE = tuple(map(int, re.match(r'(\d+)\.(\d+)', shapely.__version__).groups())) >= (2, 1)
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _find_splits(xy):
+        """Returns the row indices of the (0, 0) separators in an (n, 2) coordinate array."""
+        splits = np.empty(xy.shape[0], dtype=np.int64)
+        count = 0
+        for i in range(xy.shape[0]):
+            if xy[i, 0] == 0 and xy[i, 1] == 0:
+                splits[count] = i
+                count += 1
+        return splits[:count]
+else:
+    _find_splits = None
+
+def _signed_ring_area(ring: np.ndarray) -> float:
+    """Shoelace formula, positive for counterclockwise rings and negative for clockwise rings."""
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * np.sum(x * np.roll(y, -1) - np.roll(x, -1) * y)
+
+def _unique_vertex_mask(coords: np.ndarray, ring_ids: np.ndarray, n_rings: int) -> np.ndarray:
+    """Returns a mask dropping consecutive duplicate vertices within each ring, they only make the validity check slower.
+    Rings that would keep fewer than three vertices are left untouched so they still reach make_valid instead of failing construction."""
+    keep = np.r_[True, np.any(coords[1:] != coords[:-1], axis=1) | (ring_ids[1:] != ring_ids[:-1])]
+    keep |= (np.bincount(ring_ids[keep], minlength=n_rings) < 3)[ring_ids]
+    return keep
 
 def zoneid_suffixid_combine(row: pd.Series) -> str:
     """Combines zoneid and suffixid columns in a dataframe into a single string.
@@ -22,38 +64,67 @@ def zoneid_suffixid_combine(row: pd.Series) -> str:
     Returns:
         str: Combined zoneid_suffixid string. If suffixid is 'NONE', '', 'NULL', 'NAN', or None, only zoneid is returned.
     """
-    suffix = str(row['suffixid']).strip().upper()
-    if suffix in ['NONE', '', 'NULL', 'NAN', None]:
+    raw = row['suffixid']
+    if raw is None or (isinstance(raw, float) and math.isnan(raw)) or str(raw).strip().upper() in _SENTINEL:
         return str(row['zoneid'])
     return f"{row['zoneid']}_{row['suffixid']}"
 
-def split_geometry(df: pd.DataFrame) -> dict:
+def _zoneid_strings(zoneid: pd.Series) -> pd.Series:
+    """Returns str() of every zoneid as an object series. astype(str) keeps missing values as NaN
+    under pandas 3, so those are converted separately to match zoneid_suffixid_combine."""
+    out = zoneid.astype(str).astype(object)
+    missing = zoneid.isna()
+    out[missing] = zoneid[missing].map(str)
+    return out
+
+def zoneid_suffixid_combine_vec(df: pd.DataFrame) -> pd.Series:
+    """Column-wise version of zoneid_suffixid_combine. Combines the zoneid and suffixid columns of a whole
+    dataframe at once instead of applying zoneid_suffixid_combine row by row.
+    When pyarrow is installed the strings are normalized with pyarrow compute kernels, otherwise pandas string methods are used.
+
+    Args:
+        df (pd.DataFrame): dataframe containing zoneid and suffixid columns
+
+    Returns:
+        pd.Series: Combined zoneid_suffixid strings as an object series. Rows with a suffixid of 'NONE', '', 'NULL', 'NAN', or None only contain the zoneid.
+    """
+    if pa is not None:
+        zoneid = pa.array(_zoneid_strings(df['zoneid']), type=pa.string())
+        suffixid = pa.array(df['suffixid'].astype('string[pyarrow]').array).cast(pa.string())
+        suffix = pc.utf8_upper(pc.utf8_trim_whitespace(suffixid))
+        mask = pc.or_(pc.is_in(suffix, value_set=pa.array(list(_SENTINEL))), pc.is_null(suffixid))
+        out = pc.if_else(mask, zoneid, pc.binary_join_element_wise(zoneid, suffixid, '_'))
+        return pd.Series(out.to_numpy(zero_copy_only=False), index=df.index, dtype=object)
+
+    suffix = df['suffixid'].astype(str).str.strip().str.upper()
+    mask = suffix.isin(_SENTINEL) | df['suffixid'].isna()
+    out = _zoneid_strings(df['zoneid'])
+    out[~mask] = out[~mask] + '_' + df.loc[~mask, 'suffixid'].astype(str).astype(object)
+    return out
+
+def split_geometry(coords: np.ndarray) -> dict:
     """Parses the geometry for a areanumber group. The first section of coordinates
     is considered the exterior of the polygon, and any subsequent sections are considered holes.
     The function assumes that the coordinates are ordered by seqno and only represent a single areanumber
 
     Args:
-        df (pandas.DataFrame): dataframe containing the geometry data for a single areanumber
+        coords (np.ndarray): (n, 2) array of x, y coordinates for a single areanumber
 
     Returns:
-        dict: dict with exterior and holes as keys. Each key contains a list of tuples representing the coordinates.
+        dict: dict with exterior and holes as keys. exterior is an (n, 2) array of coordinates and holes is a list of (n, 2) arrays.
         If no valid geometry is found, returns None.
     """
     logger.debug("Starting split_geometry function for areanumber group.")
-    logger.debug("Input dataframe shape: %s", df.shape)
-    coords = df[['x', 'y']].values.tolist()
-    parts = []
-    current = []
-
-    for x, y in coords:
-        if (x, y) == (0, 0):
-            if current:
-                parts.append(current)
-                current = []
-        else:
-            current.append((x, y))
-    if current:
-        parts.append(current)
+    # The jitted separator scan is typed for float coordinates
+    coords = np.asarray(coords, dtype=np.float64)
+    logger.debug("Input coordinates shape: %s", coords.shape)
+    # (0, 0) rows separate the exterior from each hole
+    if _find_splits is not None:
+        sep = _find_splits(coords)
+    else:
+        sep = np.flatnonzero((coords[:, 0] == 0) & (coords[:, 1] == 0))
+    parts = [part[1:] if i else part for i, part in enumerate(np.split(coords, sep))]
+    parts = [part for part in parts if len(part)]
 
     if not parts:
         logger.warning("No valid geometry parts found.")
@@ -61,57 +132,169 @@ def split_geometry(df: pd.DataFrame) -> dict:
 
     result = {
         'exterior': parts[0],
-        'holes': parts[1:] if len(parts) > 1 else []
+        'holes': parts[1:]
     }
     return result
 
 
-def build_multipolygon(group_df: pd.DataFrame) -> Polygon or MultiPolygon: # type: ignore
+def build_multipolygon(group_df: pd.DataFrame, validate: bool = True) -> Polygon or MultiPolygon: # type: ignore
     """Creates polygon geometry from a dataframe. This function assumes that the dataframe only contains a single
-    zoneid_suffixid. The function first groups the dataframe by areanumber and then sorts the coordinates by seqno.
-    It then calls the split_geometry function to parse the coordinates into exterior and hole parts.
+    zoneid_suffixid. The function orders the coordinates once by areanumber and seqno and then walks the
+    areanumber boundaries of the sorted coordinates. It then calls the split_geometry function to parse the coordinates into exterior and hole parts.
+    The rings of every areanumber are collected and the polygons are constructed in a single from_ragged_array call.
     Finally, it creates a Polygon or MultiPolygon object from the parsed coordinates.
+    A single areanumber without holes is built directly and only falls back to the full path if it is invalid.
     If no valid geometry is found, returns None.
 
     Args:
         group_df (pd.DataFrame): dataframe containing the geometry data for a single zoneid_suffixid
+        validate (bool, optional): check and repair polygon validity. Pass False for trusted input
+            to skip the GEOS validity checks entirely. Defaults to True.
 
     Returns:
         Polygon or MultiPolygon: Polygon or MultiPolygon object representing the geometry.
         If no valid geometry is found, returns None.
     """
+    rings = []
+    rings_per_poly = []
     polygons = []
 
-    for _, area_group in group_df.groupby('areanumber'):
-        area_group = area_group.sort_values('seqno')
-        geom_parts = split_geometry(area_group)
+    areanumbers = group_df['areanumber'].to_numpy()
+    seqno = group_df['seqno'].to_numpy()
+    x = group_df['x'].to_numpy(dtype=np.float64)
+    y = group_df['y'].to_numpy(dtype=np.float64)
+
+    # Fast path for the common case of a single areanumber with only an exterior ring
+    if (len(areanumbers) and not pd.isna(areanumbers[0]) and (areanumbers == areanumbers[0]).all()
+            and not ((x == 0) & (y == 0)).any()):
+        order = np.argsort(seqno, kind='stable')
+        shell = np.column_stack((x[order], y[order]))
+        shell = shell[_unique_vertex_mask(shell, np.zeros(len(shell), dtype=np.int64), 1)]
+        if _signed_ring_area(shell) < 0:
+            shell = shell[::-1]
+        poly = shapely.polygons(shell)
+        if not validate or poly.is_valid:
+            return poly
+
+    # Order by areanumber then seqno, dropping rows without an areanumber. Integer codes keep
+    # the lexsort working for object columns that mix str and int areanumbers
+    codes = pd.factorize(areanumbers, sort=True)[0]
+    index = np.flatnonzero(codes >= 0)
+    index = index[np.lexsort((seqno[index], codes[index]))]
+    areanumbers = codes[index]
+    coords = np.column_stack((x[index], y[index]))
+
+    bounds = np.flatnonzero(np.r_[True, areanumbers[1:] != areanumbers[:-1]])
+    bounds = np.r_[bounds, len(areanumbers)]
+
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        geom_parts = split_geometry(coords[start:end])
 
         if geom_parts:
-            poly = Polygon(geom_parts['exterior'], holes=geom_parts['holes'])
-            poly = orient(poly, sign=1.0)  # Fix winding
-            if not poly.is_valid:
-                logger.warning("Invalid polygon detected: %s", poly)
-                logger.warning("Validity explanation: %s", explain_validity(poly))
-                logger.warning("Attempting to fix invalid polygon.")
-                if version.parse(shapely.__version__) >= version.parse("2.1.0"):
-                    poly = make_valid(poly, method='structure')
-                else:
-                    poly = make_valid(poly)
-                if isinstance(poly, GeometryCollection):
-                    logger.warning("GeometryCollection detected after make_valid. Extracting only polygon and multipolygon geometries.")
-                    extracted = [geom for geom in poly.geoms if isinstance(geom, (Polygon, MultiPolygon)) and not geom.is_empty]
-                    if extracted:
-                        polygons.extend(extracted)
-                    else:
-                        logger.warning("No valid polygons found in GeometryCollection.")
-                    continue
-            if poly.is_empty:
-                logger.warning("Empty polygon detected.")
-            if poly.is_valid and not poly.is_empty:
-                polygons.append(poly)
+            # Fix winding, exterior counterclockwise and holes clockwise
+            exterior = geom_parts['exterior']
+            if _signed_ring_area(exterior) < 0:
+                exterior = exterior[::-1]
+            holes = [hole[::-1] if _signed_ring_area(hole) > 0 else hole for hole in geom_parts['holes']]
+            poly_rings = [exterior, *holes]
+            rings_per_poly.append(len(poly_rings))
+            rings.extend(poly_rings)
+
+    if not rings:
+        return None
+
+    ring_ids = np.repeat(np.arange(len(rings)), [len(ring) for ring in rings])
+    ring_coords = np.concatenate(rings)
+    keep = _unique_vertex_mask(ring_coords, ring_ids, len(rings))
+    ring_offsets = np.r_[0, np.cumsum(np.bincount(ring_ids[keep], minlength=len(rings)))]
+    geom_offsets = np.r_[0, np.cumsum(rings_per_poly)]
+    # Every polygon is built from the offsets in a single call
+    polys = shapely.from_ragged_array(shapely.GeometryType.POLYGON, ring_coords[keep], (ring_offsets, geom_offsets))
+
+    valid = np.ones(len(polys), dtype=bool)
+    if validate:
+        valid = shapely.is_valid(polys)
+        invalid = ~valid
+        if invalid.any():
+            # is_valid_reason re-runs the GEOS validity check, only pay for it when the warning is emitted
+            if logger.isEnabledFor(logging.WARNING):
+                bad = polys[invalid]
+                reasons = shapely.is_valid_reason(bad)
+                logger.warning("Invalid polygons detected: %s", list(zip(shapely.to_wkt(bad).tolist(), reasons.tolist())))
+            logger.warning("Attempting to fix %d invalid polygon(s).", invalid.sum())
+            if _MAKE_VALID_STRUCTURE:
+                polys[invalid] = shapely.make_valid(polys[invalid], method='structure', keep_collapsed=False)
+            else:
+                polys[invalid] = shapely.make_valid(polys[invalid])
+            valid[invalid] = shapely.is_valid(polys[invalid])
+    empty = shapely.is_empty(polys)
+    type_ids = shapely.get_type_id(polys)
+    polygon_types = [shapely.GeometryType.POLYGON, shapely.GeometryType.MULTIPOLYGON]
+
+    for poly, is_valid, is_empty, type_id in zip(polys, valid, empty, type_ids):
+        if type_id == shapely.GeometryType.GEOMETRYCOLLECTION:
+            logger.warning("GeometryCollection detected after make_valid. Extracting only polygon and multipolygon geometries.")
+            parts = shapely.get_parts(poly)
+            extracted = parts[np.isin(shapely.get_type_id(parts), polygon_types) & ~shapely.is_empty(parts)]
+            if len(extracted):
+                polygons.extend(extracted.tolist())
+            else:
+                logger.warning("No valid polygons found in GeometryCollection.")
+            continue
+        if is_empty:
+            logger.warning("Empty polygon detected.")
+        elif type_id not in polygon_types:
+            # make_valid collapses degenerate areas to lines or points, those cannot be part of the zone
+            logger.warning("%s detected after make_valid. Dropping non-polygonal geometry.", poly.geom_type)
+        elif is_valid:
+            polygons.append(poly)
 
     if not polygons:
         return None
     if len(polygons) == 1:
         return polygons[0]
-    return MultiPolygon(polygons)
+    # make_valid can return MultiPolygons, flatten them so every part is a Polygon
+    return shapely.multipolygons(shapely.get_parts(polygons))
+
+
+def submit_multipolygons(executor: Executor, df: pd.DataFrame, validate: bool = True) -> dict:
+    """Submits build_multipolygon for every zoneid_suffixid in a dataframe to an executor.
+    The caller collects each result from its future, so work on finished zones can start while the rest are still building.
+
+    Args:
+        executor (Executor): executor the zoneid_suffixid groups are submitted to
+        df (pd.DataFrame): dataframe containing the geometry data and a zoneid_suffixid column
+        validate (bool, optional): passed through to build_multipolygon. Defaults to True.
+
+    Returns:
+        dict: dict of zoneid_suffixid to the Future of its build_multipolygon call.
+    """
+    return {
+        zone: executor.submit(build_multipolygon, zone_df, validate)
+        for zone, zone_df in df.groupby('zoneid_suffixid', sort=False)
+    }
+
+
+def build_all_multipolygons(df: pd.DataFrame, validate: bool = True, max_workers: int | None = None) -> tuple[dict, dict]:
+    """Builds the geometry of every zoneid_suffixid in a dataframe. Each zoneid_suffixid group is passed to
+    build_multipolygon on a thread pool.
+
+    Args:
+        df (pd.DataFrame): dataframe containing the geometry data and a zoneid_suffixid column
+        validate (bool, optional): passed through to build_multipolygon. Defaults to True.
+        max_workers (int | None, optional): maximum number of threads. Defaults to the ThreadPoolExecutor default.
+
+    Returns:
+        tuple[dict, dict]: dict of zoneid_suffixid to the geometry returned by build_multipolygon, and
+        dict of zoneid_suffixid to the exception raised while building that zoneid_suffixid.
+    """
+    polygons = {}
+    errors = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = submit_multipolygons(executor, df, validate)
+    for zone, future in futures.items():
+        try:
+            polygons[zone] = future.result()
+        except Exception as e:
+            errors[zone] = e
+    return polygons, errors